@@ -1,5 +1,13 @@
 from components.gui import GuiComponentInterface, Separator
-from components.scene import Light, LightMarker, Model, PointLight, SpotLight, SunLight
+from components.scene import (
+    Light,
+    LightMarker,
+    MeshBatcher,
+    Model,
+    PointLight,
+    SpotLight,
+    SunLight,
+)
 
 __all__ = [
     "GuiComponentInterface",
@@ -10,4 +18,5 @@ __all__ = [
     "PointLight",
     "SpotLight",
     "Model",
+    "MeshBatcher",
 ]
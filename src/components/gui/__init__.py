@@ -1,4 +1,17 @@
+from components.gui.coalesce import Coalesced
 from components.gui.interfaces import GuiComponentInterface
-from components.gui.widgets import Separator
+from components.gui.widgets import (
+    ErrorDialog,
+    Separator,
+    as_rgb,
+    make_color,
+)
 
-__all__ = ["GuiComponentInterface", "Separator"]
+__all__ = [
+    "Coalesced",
+    "GuiComponentInterface",
+    "Separator",
+    "ErrorDialog",
+    "make_color",
+    "as_rgb",
+]
@@ -0,0 +1,39 @@
+from typing import Callable
+
+from open3d.cpu.pybind.visualization import gui
+
+
+class Coalesced:
+    # Calls the callback once per main loop iteration with the latest arguments,
+    # however many times it was called in between (e.g. while a slider is dragged)
+
+    def __init__(self, callback: Callable, window: gui.Window = None):
+        self._callback = callback
+        self._window = window
+
+        self._args = None
+        self._pending = False
+
+    def __call__(self, *args):
+        # Without a window there is no main loop to post to
+        if self._window is None:
+            self._callback(*args)
+            return
+
+        self._args = args
+        if self._pending:
+            return
+
+        self._pending = True
+        gui.Application.instance.post_to_main_thread(self._window, self._flush)
+
+    def cancel(self):
+        self._args = None
+
+    def _flush(self):
+        self._pending = False
+        args, self._args = self._args, None
+
+        # Cancelled after it was posted
+        if args is not None:
+            self._callback(*args)
@@ -1,13 +1,38 @@
+import functools
+from typing import Tuple, Union
+
+import numpy as np
 from open3d.visualization import gui
 
 
+@functools.lru_cache(maxsize=64)
+def make_color(rgb: Tuple[float, float, float], alpha: float = 1.0) -> gui.Color:
+    # Color edits copy the value on assignment, so instances can be shared
+    return gui.Color(*rgb, alpha)
+
+
+def as_rgb(
+    color: Union[Tuple[float, float, float], np.ndarray, gui.Color],
+) -> Union[Tuple[float, float, float], np.ndarray]:
+    if isinstance(color, gui.Color):
+        return color.red, color.green, color.blue
+    return color
+
+
 class Separator(gui.Label):
 
+    # Only pybind properties are set, instances need no __dict__
+    __slots__ = ()
+
+    HEIGHT_EM = 0.5
+    HORIZONTAL_PADDING_EM = 0
+    VERTICAL_PADDING_EM = 1
+
     def __init__(self):
         super().__init__("")
-        self.height_em = 0.5
-        self.horizontal_padding_em = 0
-        self.vertical_padding_em = 1
+        self.height_em = self.HEIGHT_EM
+        self.horizontal_padding_em = self.HORIZONTAL_PADDING_EM
+        self.vertical_padding_em = self.VERTICAL_PADDING_EM
 
 
 class ErrorDialog:
@@ -21,7 +46,7 @@ class ErrorDialog:
 
         row = gui.Horiz(2, gui.Margins(0, 0, 0, 0))
         ok_button = gui.Button("OK")
-        ok_button.set_on_clicked(lambda: window.close_dialog())
+        ok_button.set_on_clicked(window.close_dialog)
         row.add_child(ok_button)
 
         content.add_child(row)
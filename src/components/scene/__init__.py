@@ -1,3 +1,4 @@
+from components.scene.batcher import MeshBatcher
 from components.scene.light import Light, LightMarker, PointLight, SpotLight, SunLight
 from components.scene.model import Model
 
@@ -8,4 +9,5 @@ __all__ = [
     "PointLight",
     "SpotLight",
     "Model",
+    "MeshBatcher",
 ]
@@ -0,0 +1,198 @@
+import functools
+from typing import Dict, Hashable, List, Tuple
+
+import numpy as np
+import open3d as o3d
+from open3d.cpu.pybind.visualization import rendering
+
+
+@functools.lru_cache(maxsize=8)
+def _make_material(shader: str) -> rendering.MaterialRecord:
+    # Color lives in the vertices, so batches with the same shader share a material
+    material = rendering.MaterialRecord()
+    material.shader = shader
+    return material
+
+
+class MeshBatcher:
+
+    def __init__(self, scene: rendering.Scene, name: str, shader: str = "defaultLit"):
+        self._scene = scene
+        self._name = name
+
+        # Instances are colored through vertex colors, one material for the batch
+        self._material = _make_material(shader)
+
+        # (vertex base, vertex count) and faces of each instance
+        self._instances: Dict[Hashable, Tuple[int, int]] = {}
+        self._faces: Dict[Hashable, np.ndarray] = {}
+
+        # Removed instances leave their (vertex base, vertex count, faces) slot
+        # behind for reuse, slots are compacted away on the next rebuild
+        self._free_slots: List[Tuple[int, int, np.ndarray]] = []
+
+        self._positions = np.zeros((0, 3), dtype=np.float32)
+        self._normals = np.zeros((0, 3), dtype=np.float32)
+        self._colors = np.zeros((0, 3), dtype=np.float32)
+
+        # Shares memory with the buffers above, handed to update_geometry
+        self._cloud = None
+
+        self._topology_dirty = False
+        self._update_flags = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def dirty(self) -> bool:
+        return self._topology_dirty or bool(self._update_flags)
+
+    def has_instance(self, key: Hashable) -> bool:
+        return key in self._instances
+
+    def add_instance(
+        self,
+        key: Hashable,
+        vertex_count: int,
+        faces: np.ndarray,
+        color: Tuple[float, float, float] = (1.0, 1.0, 1.0),
+    ):
+        # Same topology as a removed instance, no rebuild needed
+        for index, (vertex_base, slot_count, slot_faces) in enumerate(self._free_slots):
+            if slot_count == vertex_count and (
+                slot_faces is faces or np.array_equal(slot_faces, faces)
+            ):
+                del self._free_slots[index]
+                self._instances[key] = (vertex_base, vertex_count)
+                self._faces[key] = slot_faces
+                self.set_color(key, color)
+                return
+
+        vertex_base = len(self._positions)
+        self._instances[key] = (vertex_base, vertex_count)
+        self._faces[key] = faces
+
+        padding = np.zeros((vertex_count, 3), dtype=np.float32)
+        self._positions = np.concatenate((self._positions, padding))
+        self._normals = np.concatenate((self._normals, padding))
+        self._colors = np.concatenate((self._colors, padding))
+        self._colors[vertex_base:] = color
+
+        self._topology_dirty = True
+
+    def remove_instance(self, key: Hashable):
+        vertex_base, vertex_count = self._instances.pop(key)
+        faces = self._faces.pop(key)
+
+        # Collapsed to a point the slot draws nothing until it is reused
+        self._positions[vertex_base : vertex_base + vertex_count] = 0.0
+        self._update_flags |= rendering.Scene.UPDATE_POINTS_FLAG
+        self._free_slots.append((vertex_base, vertex_count, faces))
+
+        if not self._instances:
+            self._topology_dirty = True
+
+    def set_vertices(
+        self, key: Hashable, positions: np.ndarray, normals: np.ndarray = None
+    ):
+        vertex_base, vertex_count = self._instances[key]
+
+        # The batch keeps the last buffers, identical ones are not re-uploaded
+        batch_positions = self._positions[vertex_base : vertex_base + vertex_count]
+        if not np.array_equal(batch_positions, positions):
+            batch_positions[:] = positions
+            self._update_flags |= rendering.Scene.UPDATE_POINTS_FLAG
+
+        if normals is not None:
+            batch_normals = self._normals[vertex_base : vertex_base + vertex_count]
+            if not np.array_equal(batch_normals, normals):
+                batch_normals[:] = normals
+                self._update_flags |= rendering.Scene.UPDATE_NORMALS_FLAG
+
+    def set_scaled_vertices(
+        self, key: Hashable, vertices: np.ndarray, scale: float, offset: np.ndarray
+    ):
+        # Scales and offsets straight into the batch, without temporaries
+        vertex_base, vertex_count = self._instances[key]
+        positions = self._positions[vertex_base : vertex_base + vertex_count]
+        np.multiply(vertices, scale, out=positions)
+        positions += offset
+        self._update_flags |= rendering.Scene.UPDATE_POINTS_FLAG
+
+    def set_color(self, key: Hashable, color: Tuple[float, float, float]):
+        vertex_base, vertex_count = self._instances[key]
+        batch_colors = self._colors[vertex_base : vertex_base + vertex_count]
+        color = np.asarray(color, dtype=np.float32)
+        if not (batch_colors == color).all():
+            batch_colors[:] = color
+            self._update_flags |= rendering.Scene.UPDATE_COLORS_FLAG
+
+    def flush(self):
+        if self._topology_dirty:
+            self._rebuild()
+
+        elif self._update_flags and self._cloud is not None:
+            # Filament only updates vertex buffers from a point cloud, the batch
+            # topology and material uploaded by add_geometry are kept as they are
+            self._scene.update_geometry(self._name, self._cloud, self._update_flags)
+
+        self._update_flags = 0
+
+    def _compact(self):
+        if not self._free_slots:
+            return
+
+        keep = np.ones(len(self._positions), dtype=bool)
+        for vertex_base, vertex_count, _ in self._free_slots:
+            keep[vertex_base : vertex_base + vertex_count] = False
+
+        self._positions = self._positions[keep]
+        self._normals = self._normals[keep]
+        self._colors = self._colors[keep]
+
+        # Instances move down by the size of the free slots below them
+        for key, (vertex_base, vertex_count) in self._instances.items():
+            shift = sum(
+                slot_count
+                for slot_base, slot_count, _ in self._free_slots
+                if slot_base < vertex_base
+            )
+            self._instances[key] = (vertex_base - shift, vertex_count)
+
+        self._free_slots.clear()
+
+    def _rebuild(self):
+        self._topology_dirty = False
+        self._compact()
+
+        if self._scene.has_geometry(self._name):
+            self._scene.remove_geometry(self._name)
+
+        if not self._instances:
+            self._cloud = None
+            return
+
+        triangles = np.concatenate(
+            [
+                self._faces[key] + vertex_base
+                for key, (vertex_base, _) in self._instances.items()
+            ]
+        )
+
+        # Tensor geometry wraps the float32 buffers without a double conversion
+        positions = o3d.core.Tensor.from_numpy(self._positions)
+        normals = o3d.core.Tensor.from_numpy(self._normals)
+        colors = o3d.core.Tensor.from_numpy(self._colors)
+
+        mesh = o3d.t.geometry.TriangleMesh()
+        mesh.vertex.positions = positions
+        mesh.vertex.normals = normals
+        mesh.vertex.colors = colors
+        mesh.triangle.indices = o3d.core.Tensor.from_numpy(triangles)
+        self._scene.add_geometry(self._name, mesh, self._material)
+
+        self._cloud = o3d.t.geometry.PointCloud(positions)
+        self._cloud.point.normals = normals
+        self._cloud.point.colors = colors
@@ -1,19 +1,43 @@
+import math
 import uuid
 from abc import ABCMeta, abstractmethod
-from typing import Tuple, Union
+from typing import Callable, List, Set, Tuple, Union
 
 import numpy as np
 import open3d as o3d
 from open3d.cpu.pybind.visualization import rendering
 from open3d.visualization import gui
 
-from components.gui import GuiComponentInterface, Separator
+from components.gui import (
+    Coalesced,
+    GuiComponentInterface,
+    Separator,
+    as_rgb,
+    make_color,
+)
+from components.scene.batcher import MeshBatcher
 from utils import sphere_dir, yaw_pitch_to_direction
 
 
+def _create_unit_sphere(resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    sphere = o3d.geometry.TriangleMesh.create_sphere(radius=1.0, resolution=resolution)
+    vertices = np.asarray(sphere.vertices, dtype=np.float32)
+    faces = np.asarray(sphere.triangles, dtype=np.int32)
+
+    # Shared by every marker
+    vertices.flags.writeable = False
+    faces.flags.writeable = False
+
+    return vertices, faces
+
+
 class LightMarker:
 
     DEFAULT_RADIUS = 0.01
+    SPHERE_RESOLUTION = 6  # a few pixels on screen, the default 20 is wasted
+
+    # Markers only scale and translate this sphere, it is never rebuilt
+    _UNIT_VERTICES, _UNIT_FACES = _create_unit_sphere(SPHERE_RESOLUTION)
 
     def __init__(
         self,
@@ -22,64 +46,114 @@ class LightMarker:
         position: Union[Tuple[float, float, float], np.ndarray] = (0.0, 0.0, 0.0),
         color: Tuple[float, float, float] = (1.0, 1.0, 1.0),
         radius: float = DEFAULT_RADIUS,
+        batcher: MeshBatcher = None,
     ):
         self._scene = scene
         self._name = name
-        self._position = (
-            np.array(position, dtype=np.float32)
-            if isinstance(position, tuple)
-            else position
-        )
-        self._color = color
+        # Own float32 buffers, setters write into them in place
+        self._position = np.empty(3, dtype=np.float32)
+        self._position[:] = position
+        self._color = np.empty(3, dtype=np.float32)
+        self._color[:] = color
         self._radius = radius
 
-        self._sphere = None
-        self._material = None
+        # Markers sharing a batcher are drawn as a single geometry, its owner
+        # flushes it once per frame
+        self._owns_batcher = batcher is None
+        self._batcher = (
+            batcher if batcher else MeshBatcher(scene, name, shader="defaultUnlit")
+        )
+
+        # Position and radius both move the vertices, color only repaints them
+        self._vertices_dirty = True
+        self._color_dirty = True
+        self._destroyed = False
 
         self._update()
 
-    def set_scene(self, scene: rendering.Scene):
+    @property
+    def radius(self) -> float:
+        return self._radius
+
+    def set_scene(self, scene: rendering.Scene, batcher: MeshBatcher = None):
+        self._remove_from_batcher()
+
         self._scene = scene
+        self._owns_batcher = batcher is None
+        self._batcher = (
+            batcher
+            if batcher
+            else MeshBatcher(scene, self._name, shader="defaultUnlit")
+        )
         self._update()
 
     def set_position(self, position: Union[Tuple[float, float, float], np.ndarray]):
-        self._position = (
-            np.array(position, dtype=np.float32)
-            if isinstance(position, tuple)
-            else position
-        )
+        if np.array_equal(position, self._position):
+            return
+
+        self._position[:] = position
+        self._vertices_dirty = True
         self._update()
 
     def set_color(self, color: Union[Tuple[float, float, float], gui.Color]):
-        if isinstance(color, gui.Color):
-            color = (color.red, color.green, color.blue)
+        color = as_rgb(color)
 
-        self._color = color
+        if np.allclose(color, self._color, rtol=0.0, atol=1e-6):
+            return
+
+        self._color[:] = color
+        self._color_dirty = True
         self._update()
 
     def set_radius(self, radius: float):
+        if math.isclose(radius, self._radius, abs_tol=1e-6):
+            return
+
         self._radius = radius
+        self._vertices_dirty = True
         self._update()
 
     def _update(self):
-        self._sphere = o3d.geometry.TriangleMesh.create_sphere(radius=self._radius)
-        self._sphere.compute_vertex_normals()
-        self._sphere.translate(self._position.astype(float))
-        self._sphere.paint_uniform_color(self._color)
+        if self._destroyed:
+            return
+
+        if not self._batcher.has_instance(self):
+            self._batcher.add_instance(
+                self, len(self._UNIT_VERTICES), self._UNIT_FACES, self._color
+            )
+            self._vertices_dirty = True
 
-        if not self._material:
-            self._material = rendering.MaterialRecord()
-            self._material.shader = "defaultUnlit"
-        self._material.base_color = (*self._color, 1.0)
+            # Unit sphere normals are its vertices and survive scale and translation
+            self._batcher.set_vertices(
+                self, self._UNIT_VERTICES, normals=self._UNIT_VERTICES
+            )
+
+        elif self._color_dirty:
+            self._batcher.set_color(self, self._color)
+
+        if self._vertices_dirty:
+            self._batcher.set_scaled_vertices(
+                self, self._UNIT_VERTICES, self._radius, self._position
+            )
 
-        if self._scene.has_geometry(self._name):
-            self._scene.remove_geometry(self._name)
-        self._scene.add_geometry(self._name, self._sphere, self._material)
+        if self._owns_batcher:
+            self._batcher.flush()
+
+        self._vertices_dirty = False
+        self._color_dirty = False
+
+    def _remove_from_batcher(self):
+        if self._batcher.has_instance(self):
+            self._batcher.remove_instance(self)
+            if self._owns_batcher:
+                self._batcher.flush()
 
     def destroy(self):
-        if self._scene.has_geometry(self._name):
-            self._scene.remove_geometry(self._name)
-        self._material = None
+        if self._destroyed:
+            return
+        self._destroyed = True
+
+        self._remove_from_batcher()
 
 
 class Light(metaclass=ABCMeta):
@@ -94,25 +168,45 @@ class Light(metaclass=ABCMeta):
         color: Tuple[float, float, float] = (1.0, 1.0, 1.0),
         intensity: float = 100000.0,
         has_marker: bool = True,
+        window: gui.Window = None,
+        marker_batcher: MeshBatcher = None,
     ):
         self._scene = scene
+        self._window = window  # for posting coalesced slider changes
+        self._coalesced_setters: List[Coalesced] = []
+        self._destroyed = False
         self._name = name if name else f"l_{uuid.uuid4().hex[:6]}"
-        self._position = (
-            np.array(position, dtype=np.float32)
-            if isinstance(position, tuple)
-            else position
-        )
-        self._color = color
+        # Own float32 buffers, setters write into them in place
+        self._position = np.empty(3, dtype=np.float32)
+        self._position[:] = position
+        self._color = np.empty(3, dtype=np.float32)
+        self._color[:] = color
         self._intensity = intensity
 
+        # Properties changed since they were last pushed to the scene
+        self._dirty_fields: Set[str] = set()
+
+        self._marker = None
         if has_marker:
             self._marker = LightMarker(
-                self._scene, f"m_{self._name}", position, self._color
+                self._scene,
+                f"m_{self._name}",
+                position,
+                self._color,
+                batcher=marker_batcher,
             )
 
         self._update()
 
     def destroy(self):
+        if self._destroyed:
+            return
+        self._destroyed = True
+
+        # Slider changes still waiting would otherwise re-add the light
+        for coalesced in self._coalesced_setters:
+            coalesced.cancel()
+
         if self._marker:
             self._marker.destroy()
             self._marker = None
@@ -123,37 +217,49 @@ class Light(metaclass=ABCMeta):
     def _update(self):
         pass
 
+    def _coalesced(self, setter: Callable) -> Coalesced:
+        coalesced = Coalesced(setter, self._window)
+        self._coalesced_setters.append(coalesced)
+        return coalesced
+
     @property
     def name(self) -> str:
         return self._name
 
     @property
-    def color(self) -> Tuple[float, float, float]:
+    def color(self) -> np.ndarray:
         return self._color
 
     @property
-    def position(self) -> np.array:
+    def position(self) -> np.ndarray:
         return self._position
 
     @property
     def marker(self) -> LightMarker:
         return self._marker
 
-    def set_scene(self, scene: rendering.Scene):
+    def set_scene(self, scene: rendering.Scene, marker_batcher: MeshBatcher = None):
         self._scene = scene
-        self._marker and self._marker.set_scene(self._scene)
+        self._marker and self._marker.set_scene(self._scene, marker_batcher)
         self._update()
 
     def set_color(self, color: Union[Tuple[float, float, float], gui.Color]):
-        if isinstance(color, gui.Color):
-            color = (color.red, color.green, color.blue)
+        color = as_rgb(color)
 
-        self._color = color
+        if np.allclose(color, self._color, rtol=0.0, atol=1e-6):
+            return
+
+        self._color[:] = color
+        self._dirty_fields.add("color")
         self._marker and self._marker.set_color(self._color)
         self._update()
 
     def set_intensity(self, intensity: float):
+        if math.isclose(intensity, self._intensity, abs_tol=1e-6):
+            return
+
         self._intensity = intensity
+        self._dirty_fields.add("intensity")
         self._update()
 
 
@@ -171,96 +277,145 @@ class SunLight(Light, GuiComponentInterface):
         intensity: float = 100000.0,
         enabled: bool = True,
         indirect_light_enable: bool = True,
+        window: gui.Window = None,
     ):
         self._azimuth_deg = azimuth_deg
         self._elevation_deg = elevation_deg
+
+        # Recomputed in place only after an angle changes
+        self._direction = np.empty(3, dtype=np.float32)
+        self._direction_dirty = True
         self._enabled = enabled
         self._indirect_light_enable = indirect_light_enable
 
+        # Sun light parameters and the enabled state are pushed separately
+        self._sun_light_dirty = True
+        self._enabled_dirty = True
+
         # Before calling supers we need to set spotlight specific attributes due to _update call
         GuiComponentInterface.__init__(self)
-        super().__init__(scene, "Sun", color, intensity=intensity, has_marker=False)
+        super().__init__(
+            scene,
+            "Sun",
+            color=color,
+            intensity=intensity,
+            has_marker=False,
+            window=window,
+        )
 
         # gui
         self._controls_group = None
 
     def set_azimuth(self, azimuth_deg: float):
+        if math.isclose(azimuth_deg, self._azimuth_deg, abs_tol=1e-6):
+            return
+
         self._azimuth_deg = azimuth_deg
+        self._direction_dirty = True
         self._update()
 
     def set_elevation(self, elevation_deg: float):
+        if math.isclose(elevation_deg, self._elevation_deg, abs_tol=1e-6):
+            return
+
         self._elevation_deg = elevation_deg
+        self._direction_dirty = True
         self._update()
 
     def set_enabled(self, enabled: bool):
+        if enabled == self._enabled:
+            return
+
         self._enabled = enabled
+        self._enabled_dirty = True
         self._update()
 
     def set_indirect_light_enabled(self, indirect_light_enabled: bool):
+        if indirect_light_enabled == self._indirect_light_enable:
+            return
+
         self._indirect_light_enable = indirect_light_enabled
         self._scene.enable_indirect_light(indirect_light_enabled)
 
-    def build_gui(self):
-        super().build_gui()
-
-        self._controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
+    def _create_controls(self) -> gui.Widget:
+        controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
 
-        self._controls_group.add_child(gui.Label("Azimuth:"))
+        controls_group.add_child(gui.Label("Azimuth:"))
         azimuth_slider = gui.Slider(gui.Slider.DOUBLE)
         azimuth_slider.set_limits(0.0, self.MAX_AZIMUTH_DEG)
         azimuth_slider.double_value = self._azimuth_deg
-        azimuth_slider.set_on_value_changed(self.set_azimuth)
-        self._controls_group.add_child(azimuth_slider)
+        azimuth_slider.set_on_value_changed(self._coalesced(self.set_azimuth))
+        controls_group.add_child(azimuth_slider)
 
-        self._controls_group.add_child(gui.Label("Elevation:"))
+        controls_group.add_child(gui.Label("Elevation:"))
         elevation_slider = gui.Slider(gui.Slider.DOUBLE)
         elevation_slider.set_limits(0.0, self.MAX_ELEVATION_DEG)
         elevation_slider.double_value = self._elevation_deg
-        elevation_slider.set_on_value_changed(self.set_elevation)
-        self._controls_group.add_child(elevation_slider)
+        elevation_slider.set_on_value_changed(self._coalesced(self.set_elevation))
+        controls_group.add_child(elevation_slider)
 
-        self._controls_group.add_child(gui.Label("Intensity:"))
+        controls_group.add_child(gui.Label("Intensity:"))
         intensity_slider = gui.Slider(gui.Slider.DOUBLE)
         intensity_slider.set_limits(0.0, self.MAX_INTENSITY)
         intensity_slider.double_value = self._intensity
-        intensity_slider.set_on_value_changed(self.set_intensity)
-        self._controls_group.add_child(intensity_slider)
+        intensity_slider.set_on_value_changed(self._coalesced(self.set_intensity))
+        controls_group.add_child(intensity_slider)
 
-        self._controls_group.add_child(gui.Label("Color:"))
+        controls_group.add_child(gui.Label("Color:"))
         color_edit = gui.ColorEdit()
-        color_edit.color_value = gui.Color(*self._color, 1.0)
+        color_edit.color_value = make_color(tuple(self._color))
         color_edit.set_on_value_changed(self.set_color)
-        self._controls_group.add_child(color_edit)
+        controls_group.add_child(color_edit)
 
         enable_checkbox = gui.Checkbox("Enabled")
         enable_checkbox.checked = self._enabled
         enable_checkbox.set_on_checked(self.set_enabled)
-        self._controls_group.add_child(enable_checkbox)
+        controls_group.add_child(enable_checkbox)
 
         enable_checkbox = gui.Checkbox("Indirect light enabled")
         enable_checkbox.checked = self._indirect_light_enable
         enable_checkbox.set_on_checked(self.set_indirect_light_enabled)
-        self._controls_group.add_child(enable_checkbox)
+        controls_group.add_child(enable_checkbox)
+
+        return controls_group
+
+    def build_gui(self):
+        super().build_gui()
+
+        # Widgets are created once and shown again on later builds
+        if not self._controls_group:
+            self._controls_group = self._create_controls()
+        self._controls_group.visible = True
 
         return self._controls_group
 
     def destroy_gui(self):
         super().destroy_gui()
 
-        if not self._controls_group:
-            return
-
-        for child in self._controls_group.children:
-            child.visible = False
-        self._controls_group = None
+        if self._controls_group:
+            self._controls_group.visible = False
 
     def destroy(self):
         raise NotImplemented("Sun light cannot be destroyed. Try disabling it instead.")
 
     def _update(self):
-        direction = sphere_dir(self._azimuth_deg, self._elevation_deg)
-        self._scene.set_sun_light(direction, self._color, self._intensity)
-        self._scene.enable_sun_light(self._enabled)
+        if self._direction_dirty:
+            sphere_dir(self._azimuth_deg, self._elevation_deg, out=self._direction)
+            self._direction_dirty = False
+            self._sun_light_dirty = True
+
+        # Color and intensity are only marked once their setter's guard passed
+        if self._dirty_fields:
+            self._dirty_fields.clear()
+            self._sun_light_dirty = True
+
+        if self._sun_light_dirty:
+            self._scene.set_sun_light(self._direction, self._color, self._intensity)
+            self._sun_light_dirty = False
+
+        if self._enabled_dirty:
+            self._scene.enable_sun_light(self._enabled)
+            self._enabled_dirty = False
 
 
 class PointLight(Light, GuiComponentInterface):
@@ -276,21 +431,27 @@ class PointLight(Light, GuiComponentInterface):
         intensity: float = 100000.0,
         falloff: float = 100.0,
         cast_shadow: bool = True,
+        window: gui.Window = None,
+        marker_batcher: MeshBatcher = None,
     ):
-        self._position = (
-            np.array(position, dtype=np.float32)
-            if isinstance(position, tuple)
-            else position
-        )
         self._falloff = falloff
         self._cast_shadow = cast_shadow
+        self._scene_light_added = False
 
         if not name:
             name = f"point_{uuid.uuid4().hex[:6]}"
 
         # Before calling supers we need to set spotlight specific attributes due to _update call
         GuiComponentInterface.__init__(self)
-        super().__init__(scene, name, position, color, intensity)
+        super().__init__(
+            scene,
+            name,
+            position,
+            color,
+            intensity,
+            window=window,
+            marker_batcher=marker_batcher,
+        )
 
         # gui
         self._controls_group = None
@@ -301,11 +462,12 @@ class PointLight(Light, GuiComponentInterface):
         )
 
     def set_position(self, position: Union[Tuple[float, float, float], np.ndarray]):
-        self._position = (
-            np.array(position, dtype=np.float32)
-            if isinstance(position, tuple)
-            else position
-        )
+        # The position buffer itself is passed back after being moved in place
+        if position is not self._position and np.array_equal(position, self._position):
+            return
+
+        self._position[:] = position
+        self._dirty_fields.add("position")
         self._marker.set_position(self._position)
         self._update()
 
@@ -317,66 +479,96 @@ class PointLight(Light, GuiComponentInterface):
             )
 
     def set_falloff(self, falloff: float):
+        if math.isclose(falloff, self._falloff, abs_tol=1e-6):
+            return
+
         self._falloff = falloff
+        self._dirty_fields.add("falloff")
         self._update()
 
     def set_cast_shadow(self, cast_shadow: bool):
+        if cast_shadow == self._cast_shadow:
+            return
+
         self._cast_shadow = cast_shadow
+        self._dirty_fields.add("cast_shadow")
         self._update()
 
-    def build_gui(self):
-        super().build_gui()
-
-        self._controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
+    def _create_controls(self) -> gui.Widget:
+        controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
 
-        self._controls_group.add_child(gui.Label("Intensity:"))
+        controls_group.add_child(gui.Label("Intensity:"))
         intensity_slider = gui.Slider(gui.Slider.DOUBLE)
         intensity_slider.set_limits(0.0, self.MAX_INTENSITY)
         intensity_slider.double_value = self._intensity
-        intensity_slider.set_on_value_changed(self.set_intensity)
-        self._controls_group.add_child(intensity_slider)
+        intensity_slider.set_on_value_changed(self._coalesced(self.set_intensity))
+        controls_group.add_child(intensity_slider)
 
-        self._controls_group.add_child(gui.Label("Falloff:"))
+        controls_group.add_child(gui.Label("Falloff:"))
         falloff_slider = gui.Slider(gui.Slider.DOUBLE)
         falloff_slider.set_limits(0.0, self.MAX_FALLOFF)
         falloff_slider.double_value = self._falloff
-        falloff_slider.set_on_value_changed(self.set_falloff)
-        self._controls_group.add_child(falloff_slider)
+        falloff_slider.set_on_value_changed(self._coalesced(self.set_falloff))
+        controls_group.add_child(falloff_slider)
 
-        self._controls_group.add_child(gui.Label("Color:"))
+        controls_group.add_child(gui.Label("Color:"))
         color_edit = gui.ColorEdit()
-        color_edit.color_value = gui.Color(*self._color, 1.0)
+        color_edit.color_value = make_color(tuple(self._color))
         color_edit.set_on_value_changed(self.set_color)
-        self._controls_group.add_child(color_edit)
+        controls_group.add_child(color_edit)
 
         cast_shadows_checkbox = gui.Checkbox("Cast shadows")
         cast_shadows_checkbox.checked = self._cast_shadow
         cast_shadows_checkbox.set_on_checked(self.set_cast_shadow)
-        self._controls_group.add_child(cast_shadows_checkbox)
+        controls_group.add_child(cast_shadows_checkbox)
 
         position_label_group = gui.Horiz(2, gui.Margins(0, 0, 0, 0))
         position_label_group.add_child(gui.Label("Position:"))
         position_label_group.add_child(self._position_label)
-        self._controls_group.add_child(position_label_group)
+        controls_group.add_child(position_label_group)
+
+        return controls_group
+
+    def build_gui(self):
+        super().build_gui()
+
+        # Widgets are created once and shown again on later builds
+        if not self._controls_group:
+            self._controls_group = self._create_controls()
+        self._controls_group.visible = True
 
         return self._controls_group
 
     def destroy_gui(self):
         super().destroy_gui()
 
-        if not self._controls_group:
-            return
+        if self._controls_group:
+            self._controls_group.visible = False
 
-        for child in self._controls_group.get_children():
-            child.visible = False
-        self._controls_group = None
+    def set_scene(self, scene: rendering.Scene, marker_batcher: MeshBatcher = None):
+        self._scene_light_added = False
+        super().set_scene(scene, marker_batcher)
 
     def destroy(self):
         super().destroy()
+        self._scene_light_added = False
         self.destroy_gui()
 
     def _update(self):
-        self._scene.remove_light(self._name)
+        if self._destroyed:
+            return
+
+        # Lights are added once, afterwards only changed properties are updated
+        if not self._scene_light_added:
+            self._add_scene_light()
+            self._scene_light_added = True
+
+        else:
+            self._update_scene_light()
+
+        self._dirty_fields.clear()
+
+    def _add_scene_light(self):
         self._scene.add_point_light(
             self._name,
             self._color,
@@ -386,6 +578,19 @@ class PointLight(Light, GuiComponentInterface):
             self._cast_shadow,
         )
 
+    def _update_scene_light(self):
+        dirty = self._dirty_fields
+        if "color" in dirty:
+            self._scene.update_light_color(self._name, self._color)
+        if "position" in dirty:
+            self._scene.update_light_position(self._name, self._position)
+        if "intensity" in dirty:
+            self._scene.update_light_intensity(self._name, self._intensity)
+        if "falloff" in dirty:
+            self._scene.update_light_falloff(self._name, self._falloff)
+        if "cast_shadow" in dirty:
+            self._scene.enable_light_shadow(self._name, self._cast_shadow)
+
 
 class SpotLight(PointLight):
 
@@ -406,9 +611,15 @@ class SpotLight(PointLight):
         cast_shadow: bool = True,
         inner_cone_angle: float = 1.0,
         outer_cone_angle: float = 1.0,
+        window: gui.Window = None,
+        marker_batcher: MeshBatcher = None,
     ):
         self._yaw = yaw
         self._pitch = pitch
+
+        # Recomputed in place only after an angle changes
+        self._direction = np.empty(3, dtype=np.float32)
+        self._direction_dirty = True
         self._inner_cone_angle = inner_cone_angle
         self._outer_cone_angle = outer_cone_angle
 
@@ -416,74 +627,119 @@ class SpotLight(PointLight):
             name = f"spot_{uuid.uuid4().hex[:6]}"
 
         # Before calling super we need to set spotlight specific attributes due to _update call
-        super().__init__(scene, name, position, color, intensity, falloff, cast_shadow)
+        super().__init__(
+            scene,
+            name,
+            position,
+            color,
+            intensity,
+            falloff,
+            cast_shadow,
+            window=window,
+            marker_batcher=marker_batcher,
+        )
 
     def set_yaw(self, yaw: float):
+        if math.isclose(yaw, self._yaw, abs_tol=1e-6):
+            return
+
         self._yaw = yaw
+        self._direction_dirty = True
+        self._dirty_fields.add("direction")
         self._update()
 
     def set_pitch(self, pitch: float):
+        if math.isclose(pitch, self._pitch, abs_tol=1e-6):
+            return
+
         self._pitch = pitch
+        self._direction_dirty = True
+        self._dirty_fields.add("direction")
         self._update()
 
     def set_inner_cone_angle(self, angle: float):
+        if math.isclose(angle, self._inner_cone_angle, abs_tol=1e-6):
+            return
+
         self._inner_cone_angle = angle
+        self._dirty_fields.add("cone_angles")
         self._update()
 
     def set_outer_cone_angle(self, angle: float):
+        if math.isclose(angle, self._outer_cone_angle, abs_tol=1e-6):
+            return
+
         self._outer_cone_angle = angle
+        self._dirty_fields.add("cone_angles")
         self._update()
 
-    def build_gui(self):
+    def _create_controls(self) -> gui.Widget:
         controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
 
         controls_group.add_child(gui.Label("Yaw:"))
         yaw_slider = gui.Slider(gui.Slider.DOUBLE)
         yaw_slider.set_limits(0.0, self.MAX_YAW)
         yaw_slider.double_value = self._yaw
-        yaw_slider.set_on_value_changed(self.set_yaw)
+        yaw_slider.set_on_value_changed(self._coalesced(self.set_yaw))
         controls_group.add_child(yaw_slider)
 
         controls_group.add_child(gui.Label("Pitch:"))
         pitch_slider = gui.Slider(gui.Slider.DOUBLE)
         pitch_slider.set_limits(0.0, self.MAX_PITCH)
         pitch_slider.double_value = self._pitch
-        pitch_slider.set_on_value_changed(self.set_pitch)
+        pitch_slider.set_on_value_changed(self._coalesced(self.set_pitch))
         controls_group.add_child(pitch_slider)
 
         controls_group.add_child(gui.Label("Inner Cone Angle:"))
         inner_cone_angle_slider = gui.Slider(gui.Slider.DOUBLE)
         inner_cone_angle_slider.set_limits(0.0, self.MAX_CONE_ANGLE)
         inner_cone_angle_slider.double_value = self._inner_cone_angle
-        inner_cone_angle_slider.set_on_value_changed(self.set_inner_cone_angle)
+        inner_cone_angle_slider.set_on_value_changed(
+            self._coalesced(self.set_inner_cone_angle)
+        )
         controls_group.add_child(inner_cone_angle_slider)
 
         controls_group.add_child(gui.Label("Outer Cone Angle:"))
         outer_cone_angle_slider = gui.Slider(gui.Slider.DOUBLE)
         outer_cone_angle_slider.set_limits(0.0, self.MAX_CONE_ANGLE)
         outer_cone_angle_slider.double_value = self._outer_cone_angle
-        outer_cone_angle_slider.set_on_value_changed(self.set_outer_cone_angle)
+        outer_cone_angle_slider.set_on_value_changed(
+            self._coalesced(self.set_outer_cone_angle)
+        )
         controls_group.add_child(outer_cone_angle_slider)
 
         # First add spotlight specific controls, then add point light controls
-        super_controls_group = super().build_gui()
-        controls_group.add_child(super_controls_group)
-        self._controls_group = controls_group
+        controls_group.add_child(super()._create_controls())
 
-        return self._controls_group
+        return controls_group
 
     def _update(self):
-        direction = yaw_pitch_to_direction(self._yaw, self._pitch)
+        if self._direction_dirty:
+            yaw_pitch_to_direction(self._yaw, self._pitch, out=self._direction)
+            self._direction_dirty = False
 
-        self._scene.remove_light(self._name)
+        super()._update()
+
+    def _add_scene_light(self):
         self._scene.add_spot_light(
             self._name,
             self._color,
             self._position,
-            direction,
+            self._direction,
             self._intensity,
             self._falloff,
             self._inner_cone_angle,
             self._outer_cone_angle,
             self._cast_shadow,
         )
+
+    def _update_scene_light(self):
+        super()._update_scene_light()
+
+        dirty = self._dirty_fields
+        if "direction" in dirty:
+            self._scene.update_light_direction(self._name, self._direction)
+        if "cone_angles" in dirty:
+            self._scene.update_light_cone_angles(
+                self._name, self._inner_cone_angle, self._outer_cone_angle
+            )
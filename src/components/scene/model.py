@@ -1,20 +1,38 @@
-from typing import Literal, Tuple, Union
+import functools
+import math
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, ClassVar, Dict, Hashable, Literal, Optional, Tuple, Union
 
 import numpy as np
 import open3d as o3d
+import torch
 from open3d.cpu.pybind.visualization import gui, rendering
 from smplx import SMPL
-from sympy.printing.pytorch import torch
-
-from components import Separator
-from components.gui import GuiComponentInterface
+from smplx.lbs import (
+    batch_rigid_transform,
+    batch_rodrigues,
+    blend_shapes,
+    vertices2joints,
+)
+
+from components.gui import (
+    ErrorDialog,
+    GuiComponentInterface,
+    Separator,
+    as_rgb,
+    make_color,
+)
+from components.scene.batcher import MeshBatcher
 from utils import get_args_parameter_index
 
 
 class Model(GuiComponentInterface):
 
     DEFAULT_SMPL_COLOR = (0.85, 0.82, 0.80)
-    DEFAULT_SMPL_POSE = [
+    GENDERS = ("neutral", "male", "female")
+    AGES = ("adult", "kid")
+    DEFAULT_SMPL_POSE = (
         # Global orientation
         0.000,  # x
         0.000,  # y
@@ -111,7 +129,11 @@ class Model(GuiComponentInterface):
         0.000,
         0.000,
         0.400,
-    ]
+    )
+    # Built once, every model clones it into its own pose tensor
+    _DEFAULT_SMPL_POSE_TENSOR = torch.from_numpy(
+        np.array(DEFAULT_SMPL_POSE, dtype=np.float32)
+    ).unsqueeze(0)
     _GUI_MODEL_PARAMS_GROUPS = [
         "Global orientation",
         "Left leg",
@@ -144,10 +166,32 @@ class Model(GuiComponentInterface):
     MIN_BETAS_VALUE = -5.0
     MAX_BETAS_VALUE = 5.0
 
-    def __init__(self, scene: rendering.Scene, *args, **kwargs):
+    # Loaded models (with their faces, normals scatter and traced posing) by SMPL
+    # arguments. SMPL tensors don't depend on the betas/pose fed to them, models
+    # can be shared
+    _smpl_cache: ClassVar[
+        Dict[
+            Hashable,
+            Tuple[SMPL, np.ndarray, torch.Tensor, Optional[torch.Tensor], Callable],
+        ]
+    ] = {}
+
+    # SMPL signature never changes, no need to inspect it on every reload
+    _GENDER_ARGS_INDEX = get_args_parameter_index(SMPL, "gender")
+    _AGE_ARGS_INDEX = get_args_parameter_index(SMPL, "age")
+
+    def __init__(
+        self,
+        scene: rendering.Scene,
+        *args,
+        window: gui.Window = None,
+        batcher: MeshBatcher = None,
+        **kwargs,
+    ):
         super().__init__()
 
         self._scene = scene
+        self._window = window
         self._model_args = list(args)  # We need to be able to modify args
         self._model_kwargs = kwargs
 
@@ -156,19 +200,81 @@ class Model(GuiComponentInterface):
         self._age = "adult"
         self._color = self.DEFAULT_SMPL_COLOR
 
+        # Several models can share a batcher and be drawn as a single geometry
+        self._batcher = batcher if batcher else MeshBatcher(scene, self._name)
+        self._batcher_faces = None
+
+        if torch.cuda.is_available():
+            self._device = torch.device("cuda")
+        elif torch.backends.mps.is_available():
+            self._device = torch.device("mps")
+        else:
+            self._device = torch.device("cpu")
+
+        # Blend shape directions are the bulk of the SMPL tensors, they are kept in
+        # half precision on GPU. Their offsets stay within ~10 cm, so
+        # float16 rounding stays below a tenth of a millimeter (bfloat16 would be
+        # ~8x coarser). Template, regressor and skinning stay in float32
+        self._dtype = torch.float16 if self._device.type == "cuda" else torch.float32
+
+        # Slider changes are coalesced into a single update per main loop iteration
+        self._pending_update = False
+
+        # Forward passes run off the main thread, one at a time, so the GUI keeps
+        # rendering while torch works (it releases the GIL inside its ops)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="smpl")
+            if window
+            else None
+        )
+        self._forward_in_flight = False
+
+        # On CUDA results are read back into pinned host buffers on their own
+        # stream, alternating between two so a pass never overwrites the buffers
+        # of the one still being applied
+        self._copy_stream = (
+            torch.cuda.Stream(self._device) if self._device.type == "cuda" else None
+        )
+        self._host_buffers = []
+        self._host_index = 0
+
+        # Shaped template and joints, recomputed only when betas change
+        self._v_shaped = None
+        self._joints = None
+
         # gui
         self._controls_group = None
-        self._pose_controls_group = None  # needed in model reset
-        self._betas_controls_group = None  # needed in model reset
+        self._pose_sliders = []  # needed in model reset
+        self._betas_sliders = []  # needed in model reset
 
+        # Bounds are needed right away to set up the camera
         self._reload(full_reload=True)
+        result = self._prepare_forward()()
+        self._update_bounds(result[0])
+
+        # With a window the model may be built on a loader thread, the scene is
+        # only touched from the main thread
+        if window:
+            gui.Application.instance.post_to_main_thread(
+                window, functools.partial(self._apply_forward, *result)
+            )
+        else:
+            self._apply_forward(*result)
 
     @property
     def bounds(self) -> o3d.geometry.AxisAlignedBoundingBox:
+        if self._bounds is None:
+            min_bound, max_bound = self._min_max_bounds()
+            self._bounds = o3d.geometry.AxisAlignedBoundingBox(
+                min_bound.astype(np.float64), max_bound.astype(np.float64)
+            )
         return self._bounds
 
     @property
     def center(self) -> np.ndarray:
+        if self._center is None:
+            min_bound, max_bound = self._min_max_bounds()
+            self._center = 0.5 * (min_bound + max_bound)
         return self._center
 
     @property
@@ -176,19 +282,31 @@ class Model(GuiComponentInterface):
         return self._color
 
     def set_color(self, color: Union[Tuple[float, float, float], gui.Color]):
-        if isinstance(color, gui.Color):
-            color = (color.red, color.green, color.blue)
+        color = as_rgb(color)
+
+        if tuple(color) == tuple(self._color):
+            return
 
         self._color = color
-        self._update()
+        if self._batcher.has_instance(self):
+            self._batcher.set_color(self, self._color)
+            self._batcher.flush()
 
     def set_gender(self, gender: Literal["neutral", "male", "female"] = "neutral"):
         self._gender = gender
         self._reload()
+        self._schedule_update()
 
     def set_age(self, age: Literal["adult", "kid"] = "adult"):
         self._age = age
         self._reload()
+        self._schedule_update()
+
+    def _on_gender_selected(self, index: int):
+        self.set_gender(self.GENDERS[index])
+
+    def _on_age_selected(self, index: int):
+        self.set_age(self.AGES[index])
 
     def build_gui(self) -> gui.Widget:
         super().build_gui()
@@ -205,25 +323,21 @@ class Model(GuiComponentInterface):
 
         general_controls_collapsable.add_child(gui.Label("Gender:"))
         gender_radio_button = gui.RadioButton(gui.RadioButton.HORIZ)
-        gender_radio_button.set_items(["Neutral", "Male", "Female"])
-        gender_radio_button.set_on_selection_changed(
-            lambda i: self.set_gender(gender_radio_button.selected_value.lower())
-        )
+        gender_radio_button.set_items([gender.title() for gender in self.GENDERS])
+        gender_radio_button.set_on_selection_changed(self._on_gender_selected)
         gender_radio_button.selected_index = 0
         general_controls_collapsable.add_child(gender_radio_button)
 
         general_controls_collapsable.add_child(gui.Label("Age:"))
         age_radio_button = gui.RadioButton(gui.RadioButton.HORIZ)
-        age_radio_button.set_items(["Adult", "Kid"])
-        age_radio_button.set_on_selection_changed(
-            lambda i: self.set_gender(age_radio_button.selected_value.lower())
-        )
+        age_radio_button.set_items([age.title() for age in self.AGES])
+        age_radio_button.set_on_selection_changed(self._on_age_selected)
         age_radio_button.selected_index = 0
         general_controls_collapsable.add_child(age_radio_button)
 
         general_controls_collapsable.add_child(gui.Label("Color"))
         color_edit = gui.ColorEdit()
-        color_edit.color_value = gui.Color(*self._color, 1.0)
+        color_edit.color_value = make_color(tuple(self._color))
         color_edit.set_on_value_changed(self.set_color)
         general_controls_collapsable.add_child(color_edit)
 
@@ -234,21 +348,22 @@ class Model(GuiComponentInterface):
         pose_controls_collapsable = gui.CollapsableVert("Pose parameters")
         pose_controls_collapsable.set_is_open(True)
 
-        self._pose_controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
+        pose_controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
         for i, group_name in enumerate(self._GUI_MODEL_PARAMS_GROUPS):
-            self._pose_controls_group.add_child(gui.Label(group_name))
+            pose_controls_group.add_child(gui.Label(group_name))
 
             for j in range(3):
                 param_index = i * 3 + j
                 pose_slider = gui.Slider(gui.Slider.DOUBLE)
                 pose_slider.set_limits(self.MIN_POSE_VALUE, self.MAX_POSE_VALUE)
-                pose_slider.double_value = self._pose[0, param_index].item()
+                pose_slider.double_value = float(self._pose_values[param_index])
                 pose_slider.set_on_value_changed(
-                    lambda v, p_i=param_index: self._on_pose_param_changed(v, p_i)
+                    functools.partial(self._on_pose_param_changed, index=param_index)
                 )
-                self._pose_controls_group.add_child(pose_slider)
+                pose_controls_group.add_child(pose_slider)
+                self._pose_sliders.append(pose_slider)
 
-        pose_controls_collapsable.add_child(self._pose_controls_group)
+        pose_controls_collapsable.add_child(pose_controls_group)
         self._controls_group.add_child(pose_controls_collapsable)
         self._controls_group.add_child(Separator())
 
@@ -256,19 +371,20 @@ class Model(GuiComponentInterface):
         betas_controls_collapsable = gui.CollapsableVert("Shape parameters (Betas)")
         betas_controls_collapsable.set_is_open(True)
 
-        self._betas_controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
+        betas_controls_group = gui.Vert(4, gui.Margins(0, 0, 0, 0))
         for i in range(10):
-            self._betas_controls_group.add_child(gui.Label(f"Beta {i}"))
+            betas_controls_group.add_child(gui.Label(f"Beta {i}"))
 
             beta_slider = gui.Slider(gui.Slider.DOUBLE)
             beta_slider.set_limits(self.MIN_BETAS_VALUE, self.MAX_BETAS_VALUE)
-            beta_slider.double_value = self._betas[0, i].item()
+            beta_slider.double_value = float(self._betas_values[i])
             beta_slider.set_on_value_changed(
-                lambda v, b_i=i: self._on_betas_param_changed(v, b_i)
+                functools.partial(self._on_betas_param_changed, index=i)
             )
-            self._betas_controls_group.add_child(beta_slider)
+            betas_controls_group.add_child(beta_slider)
+            self._betas_sliders.append(beta_slider)
 
-        betas_controls_collapsable.add_child(self._betas_controls_group)
+        betas_controls_collapsable.add_child(betas_controls_group)
         self._controls_group.add_child(betas_controls_collapsable)
 
         return self._controls_group
@@ -282,88 +398,387 @@ class Model(GuiComponentInterface):
         for child in self._controls_group.children:
             child.visible = False
 
-        self._pose_controls_group = None
-        self._betas_controls_group = None
+        self._pose_sliders = []
+        self._betas_sliders = []
         self._controls_group = None
 
     def _on_reset_model_click(self):
         self._reload(full_reload=True)
+        self._schedule_update()
 
-        # Reset pose sliders
-        if self._pose_controls_group:
-            i = 0
-            for control in self._pose_controls_group.get_children():
-                if not isinstance(control, gui.Slider):
-                    continue
-
-                control.double_value = self.DEFAULT_SMPL_POSE[i]
-                i += 1
+        for slider, value in zip(self._pose_sliders, self._pose_values):
+            slider.double_value = float(value)
 
-        # Reset betas sliders
-        if self._betas_controls_group:
-            i = 0
-            for control in self._betas_controls_group.get_children():
-                if not isinstance(control, gui.Slider):
-                    continue
-
-                control.double_value = 0.0
-                i += 1
+        for slider in self._betas_sliders:
+            slider.double_value = 0.0
 
     def _on_pose_param_changed(self, value: float, index: int):
-        self._pose[0, index] = value
-        self._update()
+        if math.isclose(self._pose_values[index], value, abs_tol=1e-6):
+            return
+
+        self._pose_values[index] = value
+        self._pose_dirty = True
+        self._schedule_update()
 
     def _on_betas_param_changed(self, value: float, index: int):
-        self._betas[0, index] = value
-        self._update()
+        if math.isclose(self._betas_values[index], value, abs_tol=1e-6):
+            return
+
+        self._betas_values[index] = value
+        self._shape_dirty = True
+        self._schedule_update()
+
+    def _schedule_update(self):
+        if not self._window:
+            self._update()
+            return
+
+        if self._pending_update:
+            return
+
+        self._pending_update = True
+        gui.Application.instance.post_to_main_thread(self._window, self._flush_update)
+
+    def _flush_update(self):
+        self._pending_update = False
+
+        # The running pass reschedules itself when it lands if anything changed
+        if self._forward_in_flight:
+            return
+
+        forward = self._prepare_forward()
+        if forward is None:
+            return
+
+        self._forward_in_flight = True
+        future = self._executor.submit(forward)
+        future.add_done_callback(self._on_forward_done)
+
+    def _on_forward_done(self, future: Future):
+        # Worker thread, the scene can only be touched from the main thread
+        gui.Application.instance.post_to_main_thread(
+            self._window, functools.partial(self._finish_forward, future)
+        )
+
+    def _finish_forward(self, future: Future):
+        self._forward_in_flight = False
+
+        try:
+            result = future.result()
+        except Exception as e:
+            # The failed pass may have carried a betas change, the next pass
+            # recomputes shape and pose. Not rescheduled here so a persistent
+            # error does not loop on dialogs, the next parameter change retries
+            self._shape_dirty = True
+            self._pose_dirty = True
+            ErrorDialog(self._window, "Unable to update SMPL model", str(e)).show()
+            return
+
+        self._apply_forward(*result)
+
+        if self._shape_dirty or self._pose_dirty:
+            self._schedule_update()
 
     def _reload(self, full_reload: bool = False):
-        gender_args_index = get_args_parameter_index(SMPL, "gender")
-        if 0 < gender_args_index < len(self._model_args):
-            self._model_args[gender_args_index] = self._gender
+        self._update_model_arguments()
+
+        key = (tuple(self._model_args), frozenset(self._model_kwargs.items()))
+        if key not in self._smpl_cache:
+            model = self._load_model()
+            faces = np.ascontiguousarray(model.faces, dtype=np.int32)
+            faces_index = torch.from_numpy(faces).long().to(self._device)
+            normals_scatter = self._normals_scatter(faces_index, model.get_num_verts())
+            pose_fn = self._trace_pose_vertices(model)
+            self._smpl_cache[key] = (
+                model,
+                faces,
+                faces_index,
+                normals_scatter,
+                pose_fn,
+            )
+        (
+            self._model,
+            self._faces,
+            self._faces_index,
+            self._normals_scatter_matrix,
+            self._pose_fn,
+        ) = self._smpl_cache[key]
+
+        if self._copy_stream is not None:
+            self._allocate_host_buffers(self._model.get_num_verts())
+
+        # All SMPL variants share their topology, only re-add if it changed
+        if self._batcher_faces is not None and not np.array_equal(
+            self._batcher_faces, self._faces
+        ):
+            self._batcher.remove_instance(self)
+            self._batcher_faces = None
+
+        # A new model needs a forward pass even with the same pose and betas
+        self._shape_dirty = True
+        self._pose_dirty = True
+
+        if full_reload:
+            # Sliders write to CPU tensors, copied to the model tensors once per
+            # update. Always separate, the forward pass may run on another thread
+            self._pose_cpu = self._DEFAULT_SMPL_POSE_TENSOR.clone()
+            self._betas_cpu = torch.zeros((1, 10), dtype=torch.float32)
+            if self._device.type == "cuda":
+                self._pose_cpu = self._pose_cpu.pin_memory()
+                self._betas_cpu = self._betas_cpu.pin_memory()
+
+            # Persistent numpy views for the sliders, element access on them
+            # skips torch indexing and dispatch
+            self._pose_values = self._pose_cpu.numpy()[0]
+            self._betas_values = self._betas_cpu.numpy()[0]
+
+            self._pose = self._pose_cpu.to(self._device, copy=True)
+            self._betas = self._betas_cpu.to(self._device, self._dtype, copy=True)
+
+    def _update_model_arguments(self):
+        if 0 < self._GENDER_ARGS_INDEX < len(self._model_args):
+            self._model_args[self._GENDER_ARGS_INDEX] = self._gender
             self._model_kwargs.pop("gender", None)
         else:
             self._model_kwargs["gender"] = self._gender
 
-        age_args_index = get_args_parameter_index(SMPL, "age")
-        if 0 < age_args_index < len(self._model_args):
-            self._model_args[age_args_index] = self._age
+        if 0 < self._AGE_ARGS_INDEX < len(self._model_args):
+            self._model_args[self._AGE_ARGS_INDEX] = self._age
             self._model_kwargs.pop("age", None)
         else:
             self._model_kwargs["age"] = self._age
 
-        self._model = SMPL(*self._model_args, **self._model_kwargs)
-        self._faces = self._model.faces.astype(np.int32)
+    def _allocate_host_buffers(self, num_vertices: int):
+        if self._host_buffers and len(self._host_buffers[0][0]) == num_vertices:
+            return
 
-        if full_reload:
-            self._pose = torch.tensor(
-                self.DEFAULT_SMPL_POSE, dtype=torch.float32
-            ).unsqueeze(0)
-            self._betas = torch.zeros((1, 10), dtype=torch.float32)
+        self._host_buffers = [
+            tuple(
+                torch.empty((num_vertices, 3), dtype=torch.float32, pin_memory=True)
+                for _ in range(2)  # vertices, normals
+            )
+            for _ in range(2)
+        ]
+        self._host_index = 0
+
+    def _load_model(self) -> SMPL:
+        model = SMPL(*self._model_args, **self._model_kwargs).to(self._device)
+        model.shapedirs = model.shapedirs.to(self._dtype)
+        model.posedirs = model.posedirs.to(self._dtype)
+        model.eval()
+        for parameter in model.parameters():
+            parameter.requires_grad_(False)
 
-        self._update()
+        return model
 
     def _update(self):
-        output = self._model(
-            betas=self._betas,
-            body_pose=self._pose[:, 3:],
-            global_orient=self._pose[:, :3],
+        forward = self._prepare_forward()
+        if forward is not None:
+            self._apply_forward(*forward())
+
+    def _prepare_forward(self) -> Optional[Callable]:
+        # Nothing changed since the last forward pass, vertices are still valid
+        if not self._shape_dirty and not self._pose_dirty:
+            return None
+
+        # Inputs are snapshot here, sliders keep writing to the CPU tensors
+        self._pose.copy_(self._pose_cpu)
+        v_shaped, joints = self._v_shaped, self._joints
+        if self._shape_dirty:
+            self._betas.copy_(self._betas_cpu)
+            v_shaped = joints = None
+
+        self._shape_dirty = False
+        self._pose_dirty = False
+
+        host = None
+        if self._host_buffers:
+            host = self._host_buffers[self._host_index]
+            self._host_index ^= 1
+
+        return functools.partial(
+            self._forward,
+            self._model,
+            self._pose_fn,
+            self._faces_index,
+            self._normals_scatter_matrix,
+            self._pose,
+            self._betas,
+            v_shaped,
+            joints,
+            host,
+            self._copy_stream,
+        )
+
+    @classmethod
+    def _forward(
+        cls,
+        model: SMPL,
+        pose_fn: Callable,
+        faces_index: torch.Tensor,
+        normals_scatter: Optional[torch.Tensor],
+        pose: torch.Tensor,
+        betas: torch.Tensor,
+        v_shaped: Optional[torch.Tensor],
+        joints: Optional[torch.Tensor],
+        host: Optional[Tuple[torch.Tensor, torch.Tensor]] = None,
+        copy_stream: Optional["torch.cuda.Stream"] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, torch.Tensor, torch.Tensor]:
+        with torch.inference_mode():
+            if v_shaped is None:
+                v_shaped, joints = cls._shape(model, betas)
+            vertices = pose_fn(pose, v_shaped, joints)[0]
+            normals = cls._vertex_normals(vertices, faces_index, normals_scatter)
+
+            if host is None:
+                # Single device to host copy of the final vertex buffers
+                return vertices.cpu().numpy(), normals.cpu().numpy(), v_shaped, joints
+
+            # Asynchronous copy to pinned memory, only this worker waits on it
+            host_vertices, host_normals = host
+            copy_stream.wait_stream(torch.cuda.current_stream(vertices.device))
+            with torch.cuda.stream(copy_stream):
+                host_vertices.copy_(vertices, non_blocking=True)
+                host_normals.copy_(normals, non_blocking=True)
+            copy_stream.synchronize()
+
+        return host_vertices.numpy(), host_normals.numpy(), v_shaped, joints
+
+    def _apply_forward(
+        self,
+        vertices: np.ndarray,
+        normals: np.ndarray,
+        v_shaped: torch.Tensor,
+        joints: torch.Tensor,
+    ):
+        self._v_shaped = v_shaped
+        self._joints = joints
+
+        if self._batcher_faces is None:
+            self._batcher.add_instance(self, len(vertices), self._faces, self._color)
+            self._batcher_faces = self._faces
+
+        self._batcher.set_vertices(self, vertices, normals)
+        self._batcher.flush()
+        self._update_bounds(vertices)
+
+    @staticmethod
+    def _shape(model: SMPL, betas: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        # Shaped template and joints only depend on betas, pose changes reuse them
+        # Only the blend shape product runs in reduced precision, the template
+        # and the joints regressed from it are float32
+        offsets = blend_shapes(betas, model.shapedirs).float()
+        v_shaped = model.v_template + offsets
+        joints = vertices2joints(model.J_regressor, v_shaped)
+        return v_shaped, joints
+
+    @classmethod
+    def _trace_pose_vertices(cls, model: SMPL) -> Callable:
+        # Input shapes never change, specialize the posing for this model
+        module = _PoseVertices(model).eval()
+
+        pose = cls._DEFAULT_SMPL_POSE_TENSOR.to(model.v_template.device)
+        v_shaped = model.v_template.unsqueeze(0)
+        joints = vertices2joints(model.J_regressor, v_shaped)
+
+        with torch.no_grad(), warnings.catch_warnings():
+            # Joint parents are constant, indexing with them is safe to trace
+            warnings.simplefilter("ignore", torch.jit.TracerWarning)
+            traced = torch.jit.trace(
+                module, (pose, v_shaped, joints), check_trace=False
+            )
+
+        # Freezing turns the SMPL tensors into constants the optimizer can fold
+        return torch.jit.optimize_for_inference(traced)
+
+    @staticmethod
+    def _pose_vertices(
+        model: SMPL,
+        pose: torch.Tensor,
+        v_shaped: torch.Tensor,
+        joints: torch.Tensor,
+    ) -> torch.Tensor:
+        # Pose half of smplx.lbs.lbs: pose blend shapes + linear blend skinning.
+        # Only the pose blend shape product runs in reduced precision
+        rot_mats = batch_rodrigues(pose.view(-1, 3)).view(1, -1, 3, 3)
+        identity = torch.eye(3, device=rot_mats.device)
+        pose_feature = (rot_mats[:, 1:, :, :] - identity).view(1, -1)
+        pose_feature = pose_feature.to(model.posedirs.dtype)
+        pose_offsets = torch.matmul(pose_feature, model.posedirs).view(1, -1, 3)
+        v_posed = v_shaped + pose_offsets.float()
+
+        _, transforms = batch_rigid_transform(
+            rot_mats, joints, model.parents, dtype=torch.float32
+        )
+        num_joints = model.J_regressor.shape[0]
+        skinning = torch.matmul(
+            model.lbs_weights.unsqueeze(0),
+            transforms.view(1, num_joints, 16),
+        ).view(1, -1, 4, 4)
+
+        return (
+            torch.einsum("bvij,bvj->bvi", skinning[:, :, :3, :3], v_posed)
+            + skinning[:, :, :3, 3]
         )
-        vertices = output.vertices.detach().cpu().numpy().squeeze()
 
-        mesh = o3d.geometry.TriangleMesh()
-        mesh.vertices = o3d.utility.Vector3dVector(vertices)
-        mesh.triangles = o3d.utility.Vector3iVector(self._faces)
-        mesh.compute_vertex_normals()
-        mesh.paint_uniform_color(self._color)
+    @staticmethod
+    def _normals_scatter(
+        faces_index: torch.Tensor, num_vertices: int
+    ) -> Optional[torch.Tensor]:
+        # Sparse matrices are not available on every backend
+        if faces_index.device.type not in ("cpu", "cuda"):
+            return None
+
+        # (vertices x faces) incidence matrix, three ones per face column
+        num_faces = faces_index.shape[0]
+        face_ids = torch.arange(num_faces, device=faces_index.device)
+        indices = torch.stack((faces_index.flatten(), face_ids.repeat_interleave(3)))
+        values = torch.ones(indices.shape[1], device=faces_index.device)
+        return torch.sparse_coo_tensor(
+            indices, values, (num_vertices, num_faces)
+        ).to_sparse_csr()
+
+    @staticmethod
+    def _vertex_normals(
+        vertices: torch.Tensor,
+        faces_index: torch.Tensor,
+        normals_scatter: Optional[torch.Tensor],
+    ) -> torch.Tensor:
+        # Area weighted face normals scattered to their vertices, as Open3D does
+        v0, v1, v2 = vertices[faces_index].unbind(1)
+        face_normals = torch.cross(v1 - v0, v2 - v0, dim=1)
+        if normals_scatter is not None:
+            normals = normals_scatter @ face_normals
+        else:
+            normals = torch.zeros_like(vertices).index_add_(
+                0, faces_index.flatten(), face_normals.repeat_interleave(3, 0)
+            )
+        return torch.nn.functional.normalize(normals, dim=1)
+
+    def _update_bounds(self, vertices: np.ndarray):
+        # Most updates never read the bounds, they are computed on demand
+        self._bounds_vertices = vertices
+        self._min_max = None
+        self._bounds = None
+        self._center = None
+
+    def _min_max_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._min_max is None:
+            self._min_max = (
+                self._bounds_vertices.min(axis=0),
+                self._bounds_vertices.max(axis=0),
+            )
+        return self._min_max
+
 
-        self._bounds = mesh.get_axis_aligned_bounding_box()
-        self._center = self._bounds.get_center()
+class _PoseVertices(torch.nn.Module):
+    # Module wrapper so the traced posing can be frozen along with the SMPL tensors
 
-        material = rendering.MaterialRecord()
-        material.shader = "defaultLit"
-        material.base_color = [*self._color, 1.0]
+    def __init__(self, model: SMPL):
+        super().__init__()
+        self.model = model
 
-        if self._scene.has_geometry(self._name):
-            self._scene.remove_geometry(self._name)
-        self._scene.add_geometry(self._name, mesh, material)
+    def forward(
+        self, pose: torch.Tensor, v_shaped: torch.Tensor, joints: torch.Tensor
+    ) -> torch.Tensor:
+        return Model._pose_vertices(self.model, pose, v_shaped, joints)
@@ -1,36 +1,97 @@
-from typing import Literal, Union
+import contextlib
+import functools
+from typing import Callable, Dict, List, Literal, Set
 
+import numpy as np
 from open3d.cpu.pybind.visualization import gui, rendering
 
 from components.gui import Separator
-from components.scene import LightMarker, PointLight, SpotLight, SunLight
+from components.scene import (
+    LightMarker,
+    MeshBatcher,
+    PointLight,
+    SpotLight,
+    SunLight,
+)
 from constants import DEFAULT_LIGHT_POSITION
 
+# Lower and upper case key codes
+_KEYS_A = frozenset((ord("a"), ord("A")))
+_KEYS_S = frozenset((ord("s"), ord("S")))
+_KEYS_D = frozenset((ord("d"), ord("D")))
+_KEYS_Z = frozenset((ord("z"), ord("Z")))
+_KEYS_X = frozenset((ord("x"), ord("X")))
+
 
 class LightsController:
 
     SELECTED_LIGHT_MARKER_RADIUS = 0.03
     LIGHT_MOVE_STEP = 0.01
 
+    _MOVE_DELTAS = {
+        265: np.array([0.0, LIGHT_MOVE_STEP, 0.0], dtype=np.float32),  # up
+        263: np.array([-LIGHT_MOVE_STEP, 0.0, 0.0], dtype=np.float32),  # left
+        266: np.array([0.0, -LIGHT_MOVE_STEP, 0.0], dtype=np.float32),  # down
+        264: np.array([LIGHT_MOVE_STEP, 0.0, 0.0], dtype=np.float32),  # right
+        271: np.array([0.0, 0.0, LIGHT_MOVE_STEP], dtype=np.float32),  # page up
+        270: np.array([0.0, 0.0, -LIGHT_MOVE_STEP], dtype=np.float32),  # page down
+    }
+    _LIGHT_MOVE_KEYS = frozenset(_MOVE_DELTAS)
+
     def __init__(
         self,
         scene: rendering.Scene,
         parent: gui.Widget,
         refresh_layout_callback: callable,
+        window: gui.Window = None,
     ):
         self._scene = scene
         self._parent = parent
+        self._window = window
         self._refresh_layout_callback = refresh_layout_callback
 
         self._lights = {}
         self._current_light = None
 
+        # Every light marker is drawn as part of one geometry, flushed in on_frame
+        self._markers_batcher = MeshBatcher(
+            self._scene, "light_markers", shader="defaultUnlit"
+        )
+        self._combobox_names: List[str] = []  # mirrors the combobox items
+        self._attached_controls: Set[str] = set()
+
+        self._refresh_depth = 0
+        self._pending_refresh = False
+
+        # Scene changes are applied once per frame in on_frame
+        self._dirty_lights: Set[str] = set()
+        self._dirty_marker_radius: Dict[str, float] = {}
+
+        # Key code -> handler, built once instead of compared on every key event
+        self._key_table: Dict[int, Callable[[], None]] = {
+            key: functools.partial(self._move_current_light, key)
+            for key in self._LIGHT_MOVE_KEYS
+        }
+        for keys, handler in (
+            (_KEYS_A, functools.partial(self._add_light, "PointLight")),
+            (_KEYS_S, functools.partial(self._add_light, "SpotLight")),
+            (_KEYS_D, self._remove_current_light),
+            (_KEYS_Z, lambda: None),  # TODO: select previous light
+            (_KEYS_X, lambda: None),  # TODO: select next light
+        ):
+            for key in keys:
+                self._key_table[key] = handler
+
         # Components
         self._point_light_button = gui.Button("Add point light (A)")
-        self._point_light_button.set_on_clicked(lambda: self._add_light("PointLight"))
+        self._point_light_button.set_on_clicked(
+            functools.partial(self._add_light, "PointLight")
+        )
 
         self._spot_light_button = gui.Button("Add spot light (S)")
-        self._spot_light_button.set_on_clicked(lambda: self._add_light("SpotLight"))
+        self._spot_light_button.set_on_clicked(
+            functools.partial(self._add_light, "SpotLight")
+        )
 
         self._lights_combobox = gui.Combobox()
         self._lights_combobox.set_on_selection_changed(self._on_selected_light_change)
@@ -51,15 +112,14 @@ class LightsController:
         sun_controls_collapsable = gui.CollapsableVert("Sun light")
         sun_controls_collapsable.set_is_open(True)
 
-        self._sun = SunLight(self._scene)
+        self._sun = SunLight(self._scene, window=self._window)
         sun_controls_collapsable.add_child(self._sun.build_gui())
         self._parent.add_child(sun_controls_collapsable)
 
         self._parent.add_child(Separator())
 
         self._current_light_options_panel = gui.CollapsableVert("Light controls")
-        self._current_light_options_panel.visible = False
-        self._current_light_options_panel.set_is_open(False)
+        self._set_panel_state(False)
         self._parent.add_child(self._current_light_options_panel)
 
         self._refresh_layout()
@@ -85,24 +145,38 @@ class LightsController:
         return self._sun
 
     def _add_light(self, type_: Literal["PointLight", "SpotLight"] = "PointLight"):
-        if type_ == "SpotLight":
-            light = SpotLight(self._scene, position=DEFAULT_LIGHT_POSITION)
-
-        else:
-            light = PointLight(self._scene, position=DEFAULT_LIGHT_POSITION)
-
-        self._current_light_options_panel.add_child(light.build_gui())
-
-        self._lights[light.name] = light
-        self._select_light(light.name)
-        self._refresh_light_combobox(light.name)
-
-        self._lights_combobox.enabled = True
-        self._remove_light_button.enabled = True
-        self._current_light_options_panel.visible = True
-        self._current_light_options_panel.set_is_open(True)
+        with self._batch_refresh():
+            if type_ == "SpotLight":
+                light = SpotLight(
+                    self._scene,
+                    position=DEFAULT_LIGHT_POSITION,
+                    window=self._window,
+                    marker_batcher=self._markers_batcher,
+                )
+
+            else:
+                light = PointLight(
+                    self._scene,
+                    position=DEFAULT_LIGHT_POSITION,
+                    window=self._window,
+                    marker_batcher=self._markers_batcher,
+                )
+
+            # Controls are built by _select_light once the light becomes current
+            self._lights[light.name] = light
+            self._combobox_names.append(light.name)
+            self._lights_combobox.add_item(light.name)
+            self._select_light(light.name)
+
+            self._lights_combobox.enabled = True
+            self._remove_light_button.enabled = True
+            self._set_panel_state(True)
 
     def _on_selected_light_change(self, text, idx):
+        # Setting selected_index from _select_light echoes back here
+        if self._current_light is not None and text == self._current_light.name:
+            return
+
         if text in self._lights:
             self._select_light(text)
 
@@ -110,104 +184,131 @@ class LightsController:
         if not self._current_light:
             return
 
-        self._current_light.destroy()
-        del self._lights[self._current_light.name]
+        with self._batch_refresh():
+            self._current_light.destroy()
+            del self._lights[self._current_light.name]
+            self._attached_controls.discard(self._current_light.name)
 
-        # Select first available light
-        light_name = list(self._lights.keys())[0] if self._lights else None
-        if light_name:
-            self._select_light(light_name)
+            index = self._combobox_names.index(self._current_light.name)
+            self._lights_combobox.remove_item(index)
+            del self._combobox_names[index]
 
-        else:
-            self._remove_light_button.enabled = False
-            self._lights_combobox.enabled = False
-            self._current_light_options_panel.visible = False
-            self._current_light_options_panel.set_is_open(False)
+            # Select first available light
+            light_name = next(iter(self._lights), None)
+            if light_name:
+                self._select_light(light_name)
 
-        self._refresh_light_combobox(light_name)
-        self._refresh_layout()
+            else:
+                self._current_light = None
+                self._remove_light_button.enabled = False
+                self._lights_combobox.enabled = False
+                self._set_panel_state(False)
+
+            self._refresh_layout()
 
     def on_key_event_handler(self, event: gui.KeyEvent) -> bool:
         if event.type != gui.KeyEvent.DOWN:
             return False
 
-        key = getattr(event, "key", None)
-        if key is None:
+        handler = self._key_table.get(event.key)
+        if handler is None:
             return False
 
-        light_move_keys = {263, 264, 265, 266, 270, 271}
-        if key in light_move_keys:
-            self._move_current_light(key)
-            return True
-        if key in (ord("a"), ord("A")):
-            self._add_light("PointLight")
-            return True
-        if key in (ord("s"), ord("S")):
-            self._add_light("SpotLight")
-            return True
-        if key in (ord("d"), ord("D")):
-            self._remove_current_light()
-            return True
-        if key in (ord("z"), ord("Z")):
-            # TODO: select previous light
-            return True
-        if key in (ord("x"), ord("X")):
-            # TODO: select previous light
-            return True
-
-        return False
+        handler()
+        return True
+
+    def on_frame(self) -> bool:
+        if (
+            not self._dirty_lights
+            and not self._dirty_marker_radius
+            and not self._markers_batcher.dirty
+        ):
+            return False
+
+        for name in self._dirty_lights:
+            # Lights may have been removed since they were moved
+            if name in self._lights:
+                light = self._lights[name]
+                light.set_position(light.position)
+        self._dirty_lights.clear()
+
+        for name, radius in self._dirty_marker_radius.items():
+            if name not in self._lights:
+                continue
+
+            self._lights[name].marker.set_radius(radius)
+        self._dirty_marker_radius.clear()
+
+        # Marker changes since the last frame go out as one update
+        self._markers_batcher.flush()
+
+        return True
 
     def _move_current_light(self, key: int):
         if not self._current_light:
             return
 
         position = self._current_light.position
-        if key == 265:  # up
-            position[1] += self.LIGHT_MOVE_STEP
-        elif key == 263:  # left
-            position[0] -= self.LIGHT_MOVE_STEP
-        elif key == 266:  # down
-            position[1] -= self.LIGHT_MOVE_STEP
-        elif key == 264:  # right
-            position[0] += self.LIGHT_MOVE_STEP
-        elif key == 271:  # page up
-            position[2] += self.LIGHT_MOVE_STEP
-        elif key == 270:  # page down
-            position[2] -= self.LIGHT_MOVE_STEP
-
-        self._current_light.set_position(position)
-
-    def _refresh_light_combobox(self, selected_light_name: Union[str, None]):
-        self._lights_combobox.clear_items()
-        for i, (name, light) in enumerate(self._lights.items()):
-            self._lights_combobox.add_item(name)
-            if name == selected_light_name:
-                self._lights_combobox.selected_index = i
+        np.add(position, self._MOVE_DELTAS[key], out=position)
+
+        # Position is updated in place, the scene catches up on the next frame
+        self._dirty_lights.add(self._current_light.name)
 
     def _select_light(self, name: str):
-        if not name or name not in self._lights:
-            self._current_light = None
-            self._refresh_light_combobox(None)
+        if self._current_light is not None and name == self._current_light.name:
             return
 
-        if self._current_light:
-            if name == self._current_light.name:
+        with self._batch_refresh():
+            if not name or name not in self._lights:
+                self._current_light = None
                 return
 
-            self._current_light.destroy_gui()
+            if self._current_light:
+                self._current_light.destroy_gui()
 
-            # Selected light may not exist anymore
-            if self._current_light.name in self._lights:
-                self._current_light.marker.set_radius(LightMarker.DEFAULT_RADIUS)
+                # Selected light may not exist anymore
+                if self._current_light.name in self._lights:
+                    self._dirty_marker_radius[self._current_light.name] = (
+                        LightMarker.DEFAULT_RADIUS
+                    )
 
-        self._current_light = self._lights[name]
-        self._current_light.marker.set_radius(self.SELECTED_LIGHT_MARKER_RADIUS)
+            self._current_light = self._lights[name]
+            self._lights_combobox.selected_index = self._combobox_names.index(name)
+            self._dirty_marker_radius[name] = self.SELECTED_LIGHT_MARKER_RADIUS
 
-        if not self._current_light.is_gui_built:
-            self._current_light_options_panel.add_child(self._current_light.build_gui())
+            # Lights keep their widgets, the panel only needs them added once
+            controls = self._current_light.build_gui()
+            if name not in self._attached_controls:
+                self._current_light_options_panel.add_child(controls)
+                self._attached_controls.add(name)
 
+            self._refresh_layout()
+
+    def _set_panel_state(self, shown: bool):
+        panel = self._current_light_options_panel
+        if panel.visible == shown and panel.get_is_open() == shown:
+            return
+
+        panel.visible = shown
+        panel.set_is_open(shown)
         self._refresh_layout()
 
+    @contextlib.contextmanager
+    def _batch_refresh(self):
+        # Nested changes ask for a single layout refresh once the outermost ends
+        self._refresh_depth += 1
+        try:
+            yield
+
+        finally:
+            self._refresh_depth -= 1
+            if not self._refresh_depth and self._pending_refresh:
+                self._pending_refresh = False
+                self._refresh_layout()
+
     def _refresh_layout(self):
-        if self._refresh_layout_callback:
+        if self._refresh_depth:
+            self._pending_refresh = True
+
+        elif self._refresh_layout_callback:
             self._refresh_layout_callback()
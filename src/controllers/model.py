@@ -1,5 +1,10 @@
+import functools
+import threading
+from typing import Callable
+
 from open3d.cpu.pybind.visualization import gui, rendering
 
+from components.gui import ErrorDialog
 from components.scene import Model
 
 
@@ -10,19 +15,70 @@ class ModelController:
         parent: gui.Widget,
         refresh_layout_callback: callable,
         *args,
+        window: gui.Window = None,
+        on_model_loaded: Callable[[Model], None] = None,
         **kwargs,
     ):
         self._scene = scene
         self._parent = parent
+        self._window = window
+        self._on_model_loaded = on_model_loaded
         self._refresh_layout_callback = refresh_layout_callback
 
-        self._model = Model(scene, *args, **kwargs)
-        self._parent.add_child(self._model.build_gui())
+        self._model = None
+
+        # Close to a hundred sliders, only built once the panel is first shown
+        self._gui_requested = False
+        self._gui_built = False
+
+        if not window:
+            self._attach_model(Model(scene, *args, **kwargs))
+            return
+
+        # Loading and tracing SMPL takes a while, the window paints meanwhile
+        threading.Thread(
+            target=self._load_model,
+            args=(args, kwargs),
+            name="smpl-loader",
+            daemon=True,
+        ).start()
 
     @property
     def model(self):
         return self._model
 
+    def on_panel_shown(self):
+        self._gui_requested = True
+        self._build_gui()
+
+    def _load_model(self, args: tuple, kwargs: dict):
+        try:
+            model = Model(self._scene, *args, window=self._window, **kwargs)
+        except Exception as e:
+            callback = functools.partial(self._show_load_error, str(e))
+        else:
+            callback = functools.partial(self._attach_model, model)
+
+        gui.Application.instance.post_to_main_thread(self._window, callback)
+
+    def _attach_model(self, model: Model):
+        self._model = model
+        self._build_gui()
+
+        if self._on_model_loaded:
+            self._on_model_loaded(self._model)
+
+    def _build_gui(self):
+        if self._gui_built or not self._gui_requested or self._model is None:
+            return
+
+        self._gui_built = True
+        self._parent.add_child(self._model.build_gui())
+        self._refresh_layout()
+
+    def _show_load_error(self, message: str):
+        ErrorDialog(self._window, "Unable to load SMPL model", message).show()
+
     def _refresh_layout(self):
         if self._refresh_layout_callback:
             self._refresh_layout_callback()
@@ -1,11 +1,20 @@
+import functools
+import os
+
+import torch
 from open3d.visualization import gui, rendering
 
-from components.gui.widgets import ErrorDialog
+from components.scene import Model
 from controllers import LightsController, ModelController
 
 
 class SMPLPlayground:
     def __init__(self):
+        # SMPL forward passes run on CPU when there is no GPU, leave cores to
+        # the renderer and GUI while a slider is dragged
+        if not torch.cuda.is_available() and not torch.backends.mps.is_available():
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2))
+
         gui.Application.instance.initialize()
 
         # Window
@@ -14,6 +23,7 @@ class SMPLPlayground:
         )
         self._window.set_on_key(self._on_key_event)
         self._window.set_on_layout(self._on_layout)
+        self._window.set_on_tick_event(self._on_tick_event)
 
         # Scene
         self._scene_widget = gui.SceneWidget()
@@ -23,11 +33,19 @@ class SMPLPlayground:
 
         self.scene = self._scene_widget.scene.scene
 
+        # Layout requests made in the same main loop iteration share one pass.
+        # Set before building the GUI, controllers may already request layouts
+        self._layout_scheduled = False
+
         # GUI components
         self._build_gui()
 
+        # Last (x, y, width, height, panel width) laid out, frames are only
+        # reassigned when it changes
+        self._layout_key = None
+
         gui.Application.instance.post_to_main_thread(
-            self._window, lambda: self._on_layout(None)
+            self._window, functools.partial(self._on_layout, None)
         )
 
     def run(self):
@@ -43,9 +61,24 @@ class SMPLPlayground:
     def _on_key_event(self, event: gui.KeyEvent) -> bool:
         return self._lights_controls.on_key_event_handler(event)
 
+    def _on_tick_event(self) -> bool:
+        return self._lights_controls.on_frame()
+
     def _on_layout(self, context):
         content_rect = self._window.content_rect
         panel_width = min(350, int(content_rect.width * 0.3))
+
+        layout_key = (
+            content_rect.x,
+            content_rect.y,
+            content_rect.width,
+            content_rect.height,
+            panel_width,
+        )
+        if layout_key == self._layout_key:
+            return
+        self._layout_key = layout_key
+
         self._scroll.frame = gui.Rect(
             content_rect.x,
             content_rect.y,
@@ -60,11 +93,15 @@ class SMPLPlayground:
         )
 
     def _refresh_layout(self):
-        self._window.set_needs_layout()
+        if self._layout_scheduled:
+            return
 
-        gui.Application.instance.post_to_main_thread(
-            self._window, lambda: self._window.set_needs_layout()
-        )
+        self._layout_scheduled = True
+        gui.Application.instance.post_to_main_thread(self._window, self._flush_layout)
+
+    def _flush_layout(self):
+        self._layout_scheduled = False
+        self._window.set_needs_layout()
 
     def _build_gui(self):
         # Base panel
@@ -89,7 +126,7 @@ class SMPLPlayground:
         # Lights panel
         self._lights_panel = gui.Vert(2, gui.Margins(4, 4, 4, 4))
         self._lights_controls = LightsController(
-            self.scene, self._lights_panel, self._refresh_layout
+            self.scene, self._lights_panel, self._refresh_layout, window=self._window
         )
         self._panel.add_child(self._lights_panel)
 
@@ -102,12 +139,13 @@ class SMPLPlayground:
             self._refresh_layout,
             model_path="./smpl",
             model_type="smpl",
+            window=self._window,
+            on_model_loaded=self._on_model_loaded,
         )
         self._panel.add_child(self._smpl_panel)
 
-        self._scene_widget.setup_camera(
-            60, self._smpl_controls.model.bounds, self._smpl_controls.model.center
-        )
+    def _on_model_loaded(self, model: Model):
+        self._scene_widget.setup_camera(60, model.bounds, model.center)
 
     def _toggle_lights_smpl_menu(self):
         self._lights_button.enabled = not self._lights_button.enabled
@@ -115,6 +153,9 @@ class SMPLPlayground:
         self._lights_panel.visible = not self._lights_panel.visible
         self._smpl_panel.visible = not self._smpl_panel.visible
 
+        if self._smpl_panel.visible:
+            self._smpl_controls.on_panel_shown()
+
         self._refresh_layout()
 
     def _print_params_info(self): ...
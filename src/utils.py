@@ -1,17 +1,23 @@
+import functools
 import inspect
 import math
-from typing import Any
+from typing import Any, Dict
 
 import numpy as np
 
 
-def sphere_dir(azimuth_deg, elevation_deg):
+def sphere_dir(azimuth_deg, elevation_deg, out: np.ndarray = None):
     az = math.radians(azimuth_deg)
     el = math.radians(elevation_deg)
-    dx = math.cos(el) * math.sin(az)
-    dy = math.sin(el)
-    dz = math.cos(el) * math.cos(az)
-    return np.array([dx, dy, dz], dtype=np.float32)
+    ce = math.cos(el)
+
+    # Callers updating every frame pass their own buffer
+    if out is None:
+        out = np.empty(3, dtype=np.float32)
+    out[0] = ce * math.sin(az)
+    out[1] = math.sin(el)
+    out[2] = ce * math.cos(az)
+    return out
 
 
 def direction_to_yaw_pitch(direction):
@@ -22,19 +28,33 @@ def direction_to_yaw_pitch(direction):
     return yaw, pitch
 
 
-def yaw_pitch_to_direction(yaw_degree, pitch_degree):
+def yaw_pitch_to_direction(yaw_degree, pitch_degree, out: np.ndarray = None):
     yaw = math.radians(yaw_degree)
     pitch = math.radians(pitch_degree)
-    dy = math.sin(pitch)
     cp = math.cos(pitch)
-    dx = cp * math.sin(yaw)
-    dz = cp * math.cos(yaw)
-    return np.array([dx, dy, dz], dtype=np.float32)
+
+    if out is None:
+        out = np.empty(3, dtype=np.float32)
+    out[0] = cp * math.sin(yaw)
+    out[1] = math.sin(pitch)
+    out[2] = cp * math.cos(yaw)
+    return out
 
 
 def get_args_parameter_index(obj: Any, parameter_name: str) -> int:
+    try:
+        return _parameter_indexes(obj).get(parameter_name, -1)
+
+    except TypeError:
+        # Unhashable callables can't be cached
+        return _signature_indexes(obj).get(parameter_name, -1)
+
+
+@functools.lru_cache(maxsize=None)
+def _parameter_indexes(obj: Any) -> Dict[str, int]:
+    return _signature_indexes(obj)
+
+
+def _signature_indexes(obj: Any) -> Dict[str, int]:
     signature = inspect.signature(obj)
-    parameters = list(signature.parameters.keys())
-    if parameter_name in parameters:
-        return parameters.index(parameter_name)
-    return -1
+    return {name: index for index, name in enumerate(signature.parameters)}